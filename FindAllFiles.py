@@ -26,16 +26,11 @@ def find_all_files(folder_path, ending='.wav'):
     License: MIT
     """
 
-    all_files = []
-
-    # Check if the folder exists
-    if not os.path.exists(folder_path):
-        print(f"The folder '{folder_path}' does not exist.")
-        return all_files
-
     # Iterate over all (mp4) files in the folder
-    for file in os.listdir(folder_path):
-        if file.lower().endswith(ending):
-            all_files.append(file)
-
-    return all_files
\ No newline at end of file
+    try:
+        with os.scandir(folder_path) as entries:
+            return [entry.name for entry in entries
+                    if entry.is_file() and entry.name.lower().endswith(ending)]
+    except FileNotFoundError:
+        print(f"The folder '{folder_path}' does not exist.")
+        return []
@@ -16,11 +16,16 @@ License: MIT
 """
 
 import datetime
+import functools
+import itertools
 import ntpath
-import re
-from time import strftime, gmtime
+import os
+import wave
 from pathlib import Path
-from faster_whisper import WhisperModel
+import ctranslate2
+import numpy as np
+from faster_whisper import BatchedInferencePipeline, WhisperModel, decode_audio
+from tqdm import tqdm
 from FindAllFiles import find_all_files  # optional if reused internally
 
 
@@ -29,39 +34,152 @@ from FindAllFiles import find_all_files  # optional if reused internally
 # ---------------------------------------------------------------------
 def time_converter(timecode_in_seconds):
     """Convert decimal seconds into HH:MM:SS,mmm format."""
-    time_in_seconds = timecode_in_seconds + 3600
-    integer_seconds, decimal_seconds = format(time_in_seconds, '.3f').split(".")
-    conv_time_code = (strftime("%H:%M:%S", gmtime(int(integer_seconds)))
-                      + "," + decimal_seconds)
-    return conv_time_code
+    total_milliseconds = int(round(timecode_in_seconds * 1000))
+    seconds, milliseconds = divmod(total_milliseconds, 1000)
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d},{milliseconds:03d}"
 
 
 # ---------------------------------------------------------------------
 # Audio transcription
 # ---------------------------------------------------------------------
-def generate_subtitles(audio_file_path, model_size, device="cpu",
-                       compute_type="int8"):
-    """Transcribe an audio file into text segments using the Whisper model."""
-    # model = WhisperModel(model_size,
-    #                      device=device,
-    #                      compute_type=compute_type,
-    #                      device_index=0)
-    if device.lower() == "cuda":
-        model = WhisperModel(model_size, device=device, compute_type=compute_type, device_index=0)
-    else:
-        model = WhisperModel(model_size, device=device, compute_type=compute_type)
+# Precisions tried in this order when compute_type is "auto"
+_AUTO_COMPUTE_TYPES = {"cuda": ("int8_float16", "float16", "int8", "float32"),
+                       "cpu": ("int8", "float32")}
+
+
+def cuda_available():
+    """Check whether CTranslate2 can see at least one CUDA device."""
+    return ctranslate2.get_cuda_device_count() > 0
+
+
+def resolve_device(device="auto"):
+    """Resolve "auto" to "cuda" if a GPU is available, otherwise to "cpu"."""
+    if device.lower() == "auto":
+        return "cuda" if cuda_available() else "cpu"
+    return device.lower()
+
+
+def compute_type_supported(device, compute_type):
+    """Check whether CTranslate2 supports the precision on the given device."""
+    try:
+        return compute_type in ctranslate2.get_supported_compute_types(device)
+    except (RuntimeError, ValueError):
+        return False
+
+
+def resolve_compute_type(device, compute_type="auto"):
+    """Resolve "auto" to the fastest precision the given device supports."""
+    if compute_type.lower() == "auto":
+        candidates = _AUTO_COMPUTE_TYPES[resolve_device(device)]
+        return next((candidate for candidate in candidates
+                     if compute_type_supported(device, candidate)), candidates[-1])
+    return compute_type.lower()
+
+
+@functools.lru_cache(maxsize=1)
+def _load_model(model_size, device, compute_type, cpu_threads):
+    """Create the WhisperModel; cached so repeated calls reuse the loaded weights."""
+    if device == "cuda":
+        return WhisperModel(model_size, device=device, compute_type=compute_type, device_index=0)
+    return WhisperModel(model_size, device=device, compute_type=compute_type,
+                        cpu_threads=cpu_threads)
+
+
+def get_model(model_size, device="auto", compute_type="auto", cpu_threads=0):
+    """
+    Load a Whisper model once and reuse it for subsequent calls.
 
-    segments, info = model.transcribe(audio_file_path,
-                                      beam_size=5,
-                                      word_timestamps=True,
-                                      vad_filter=True,
-                                      multilingual=True)
+    cpu_threads sets the number of threads used on CPU; 0 uses all cores
+    instead of CTranslate2's default of 4.
+    """
+    device = resolve_device(device)
+    cpu_threads = cpu_threads or os.cpu_count() or 4
+    return _load_model(model_size, device, resolve_compute_type(device, compute_type),
+                       cpu_threads)
+
+
+def load_audio(audio_file_path, sampling_rate=16000):
+    """
+    Load an audio file as a mono float32 array at the given sampling rate.
+
+    16-bit mono WAV files that already have the target sampling rate (as
+    written by video_to_audio.py) are read directly; all other files are
+    decoded and resampled by faster-whisper.
+    """
+    try:
+        with wave.open(str(audio_file_path), "rb") as wav_file:
+            if (wav_file.getframerate() == sampling_rate
+                    and wav_file.getnchannels() == 1
+                    and wav_file.getsampwidth() == 2):
+                frames = wav_file.readframes(wav_file.getnframes())
+                # Drop a trailing partial sample of a truncated file
+                frames = frames[:len(frames) // 2 * 2]
+                return np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    except (wave.Error, EOFError):
+        pass
+    return decode_audio(str(audio_file_path), sampling_rate=sampling_rate)
+
+
+def generate_subtitles(audio_file_path, model_size, device="auto",
+                       compute_type="auto", model=None, batch_size=1,
+                       vad_parameters=None, language=None):
+    """
+    Transcribe an audio file into text segments using the Whisper model.
+
+    audio_file_path may also be an already loaded audio array (see
+    load_audio()), which avoids decoding the file again.
+
+    With batch_size > 1 the speech chunks found by the VAD are decoded in
+    batches (BatchedInferencePipeline), which keeps the GPU busy instead of
+    decoding one 30 s window at a time.
+
+    vad_parameters is passed to the Silero VAD (e.g. {"threshold": 0.5,
+    "min_silence_duration_ms": 500}); None keeps faster-whisper's defaults.
+
+    If a language code (e.g. "de") is given, language detection is skipped;
+    with None the language is detected and may change between segments.
+    """
+    if model is None:
+        model = get_model(model_size, device, compute_type)
+
+    transcribe_options = dict(beam_size=5,
+                              word_timestamps=True,
+                              vad_filter=True,
+                              vad_parameters=vad_parameters,
+                              language=language,
+                              multilingual=language is None)
+    if batch_size > 1:
+        pipeline = BatchedInferencePipeline(model=model)
+        segments, info = pipeline.transcribe(audio_file_path,
+                                             batch_size=batch_size,
+                                             **transcribe_options)
+    else:
+        segments, info = model.transcribe(audio_file_path, **transcribe_options)
     return segments, info
 
 
+def collect_segments(segments, info):
+    """
+    Run the transcription by consuming the lazy segment generator exactly once.
+
+    Progress is shown in seconds of audio, based on info.duration.
+    """
+    collected = []
+    with tqdm(total=round(info.duration, 2), unit="s", leave=False) as progress_bar:
+        for segment in segments:
+            collected.append(segment)
+            progress_bar.update(round(max(segment.end - progress_bar.n, 0), 2))
+        progress_bar.update(round(max(progress_bar.total - progress_bar.n, 0), 2))
+    return collected
+
+
 # ---------------------------------------------------------------------
 # Word and sentence processing
 # ---------------------------------------------------------------------
+_SENTENCE_END_CHARS = frozenset(".!?")
+_ABBREVIATIONS = frozenset({"z.B.", "u.a.", "d.h.", "bzw.", "etc.", "usw.", "z. B.", "u. a.", "d. h."})
+
+
 def extract_wordlist(segments):
     """Extract all words from the Whisper output segments."""
     word_list = []
@@ -74,13 +192,12 @@ def extract_wordlist(segments):
 def sentence_end(word):
     """Determine if a given word marks the end of a sentence."""
     # Ignore abbreviations
-    abbreviations = {' z.B.', ' u.a.', ' d.h.', ' bzw.', ' etc.', ' usw.', ' z. B.', ' u. a.', ' d. h.'}
-    if word in abbreviations:
+    if word.strip() in _ABBREVIATIONS:
         return False
     # Delete quotations or brackets at the end
     cleaned = word.rstrip('”"\'»›)]')
     # Check if the word ends with a punctuation mark
-    return bool(re.search(r'[.!?]+$', cleaned))
+    return bool(cleaned) and cleaned[-1] in _SENTENCE_END_CHARS
 
 
 def generate_list_of_segments_from_words(word_list):
@@ -101,67 +218,98 @@ def generate_list_of_segments_from_words(word_list):
 # ---------------------------------------------------------------------
 # Segment manipulation
 # ---------------------------------------------------------------------
-def number_of_chars(segment):
-    """Count total number of characters in a segment."""
-    return sum(len(w.word) for w in segment)
+def word_columns(word_list):
+    """
+    Collect start times, end times and character counts of a list of words.
+
+    The character counts are returned as prefix sums: prefix_chars[i] is the
+    number of characters of word_list[:i], so any range can be counted in O(1).
+    """
+    starts = [w.start for w in word_list]
+    ends = [w.end for w in word_list]
+    prefix_chars = list(itertools.accumulate((len(w.word) for w in word_list), initial=0))
+    return starts, ends, prefix_chars
 
 
-def separable_segment(segment, max_std_time, max_lines, max_chars_line):
-    """Determine whether a segment is too long and should be split."""
-    segment_chars = number_of_chars(segment)
-    standing_time = segment[-1].end - segment[0].start
+def number_of_chars(prefix_chars, lo, hi):
+    """Count total number of characters of the words word_list[lo:hi]."""
+    return prefix_chars[hi] - prefix_chars[lo]
+
+
+def separable_segment(starts, ends, prefix_chars, lo, hi, max_std_time, max_lines, max_chars_line):
+    """Determine whether the words word_list[lo:hi] are too long and should be split."""
+    segment_chars = number_of_chars(prefix_chars, lo, hi)
+    standing_time = ends[hi - 1] - starts[lo]
     return (
         standing_time > max_std_time
         and segment_chars > max_chars_line * max_lines
-        and len(segment) > 1
+        and hi - lo > 1
     )
 
 
-def separate_segment(segment, min_std_time, max_std_time, max_lines, max_chars_line):
-    """Split a long segment into two shorter ones based on punctuation or duration."""
-    first_segment = []
-    second_segment = segment.copy()
+def separate_segment(word_list, starts, ends, prefix_chars, lo, hi,
+                     min_std_time, max_std_time, max_lines, max_chars_line):
+    """
+    Split the words word_list[lo:hi] into two shorter parts based on punctuation or duration.
+
+    Returns the index of the first word of the second part.
+    """
     punctuation = ".。,，!！?？:：”)]};"
     stop_words = [" oder", " und", " sowie", " als auch", " sondern", " aber", " denn", " doch", " bzw."]
 
-    for i in range(len(segment)):
-        first_segment.append(segment[i])
-        del second_segment[0]
-        if (any(elem in segment[i].word for elem in punctuation)
-            and first_segment[-1].end - first_segment[0].start >= min_std_time):
-            return first_segment, second_segment
-        if (i + 1 < len(segment) and segment[i + 1].word in stop_words
-            and first_segment[-1].end - first_segment[0].start >= min_std_time):
-            return first_segment, second_segment
-        if (number_of_chars(first_segment) >= max_lines * max_chars_line
-            and first_segment[-1].end - first_segment[0].start >= min_std_time):
-            return first_segment, second_segment
-        if (first_segment[-1].end - first_segment[0].start >= max_std_time):
-            return first_segment, second_segment
+    for i in range(lo, hi):
+        split_at = i + 1
+        first_std_time = ends[i] - starts[lo]
+        if (any(elem in word_list[i].word for elem in punctuation)
+            and first_std_time >= min_std_time):
+            return split_at
+        if (split_at < hi and word_list[split_at].word in stop_words
+            and first_std_time >= min_std_time):
+            return split_at
+        if (number_of_chars(prefix_chars, lo, split_at) >= max_lines * max_chars_line
+            and first_std_time >= min_std_time):
+            return split_at
+        if first_std_time >= max_std_time:
+            return split_at
         # If the standing time of the second segment is too short
-        if (len(second_segment) > 1 and second_segment[-1].end - second_segment[0].start <= min_std_time):
-            return first_segment, second_segment
-        if len(second_segment) == 1:
-            return first_segment, second_segment
+        if hi - split_at > 1 and ends[hi - 1] - starts[split_at] <= min_std_time:
+            return split_at
+        if hi - split_at == 1:
+            return split_at
 
 
 def generate_subtitle_segments(segments, min_std_time, max_std_time, max_lines, max_chars_line):
     """Generate final subtitle segments, splitting long sentences if needed."""
     new_segments = []
     for segment in segments:
-        while separable_segment(segment, max_std_time, max_lines, max_chars_line):
-            first_segment, second_segment = separate_segment(segment, min_std_time, max_std_time, max_lines, max_chars_line)
-            new_segments.append(first_segment)
-            segment = second_segment
-        new_segments.append(segment)
+        # Most sentences are short enough to be kept as they are; the word
+        # columns are only built for sentences that actually need splitting.
+        if (segment[-1].end - segment[0].start <= max_std_time
+                or len(segment) < 2
+                or sum(len(w.word) for w in segment) <= max_chars_line * max_lines):
+            new_segments.append(segment)
+            continue
+        starts, ends, prefix_chars = word_columns(segment)
+        lo, hi = 0, len(segment)
+        while separable_segment(starts, ends, prefix_chars, lo, hi, max_std_time, max_lines, max_chars_line):
+            split_at = separate_segment(segment, starts, ends, prefix_chars, lo, hi,
+                                        min_std_time, max_std_time, max_lines, max_chars_line)
+            new_segments.append(segment[lo:split_at])
+            lo = split_at
+        new_segments.append(segment[lo:hi] if lo else segment)
     return new_segments
 
 
 def insert_frame(segments, frame_time=0.042):
     """Insert one frame at the beginning of segments to prevent overlap."""
-    for i in range(len(segments) - 1):
-        if segments[i][-1].end == segments[i + 1][0].start:
-            segments[i + 1][0].start = segments[i + 1][0].start + frame_time
+    if len(segments) < 2:
+        return segments
+    ends = np.fromiter((s[-1].end for s in segments[:-1]), dtype=np.float64, count=len(segments) - 1)
+    starts = np.fromiter((s[0].start for s in segments[1:]), dtype=np.float64, count=len(segments) - 1)
+    # Compare with a small absolute tolerance instead of exact float equality
+    touching = np.isclose(ends, starts, rtol=0.0, atol=1e-4)
+    for i in np.flatnonzero(touching):
+        segments[i + 1][0].start = segments[i + 1][0].start + frame_time
     return segments
 
 
@@ -230,44 +378,63 @@ def split_subtitle_text(text, max_chars_line):
 
 def join_text(segment, max_chars_line):
     """Join words into subtitle lines with automatic line breaks."""
-    text = "".join([w.word for w in segment])
-
-    text = ""
-    for word in segment:
-        # replace the ending "Innen" by "*innen"
-        word_string = word.word
-        if word_string.endswith("Innen"):
-            word_string = word_string[:-5] + "*innen"
-        # attach the word to the line
-        text = text + word_string
-
+    # replace the ending "Innen" by "*innen"
+    text = "".join(w.word[:-5] + "*innen" if w.word.endswith("Innen") else w.word
+                   for w in segment)
     return split_subtitle_text(text, max_chars_line)
 
 
 def write_subtitles(srt_file_path, segments, max_chars_line):
     """Write subtitle segments into a .srt file."""
+    entries = [
+        f"{i}\n{time_converter(segment[0].start)} --> {time_converter(segment[-1].end)}\n"
+        f"{join_text(segment, max_chars_line)}"
+        for i, segment in enumerate(segments, start=1)
+    ]
     with open(srt_file_path, "w", encoding="utf-8") as srt_file:
-        for i, segment in enumerate(segments, start=1):
-            srt_file.write(str(i) + "\n")
-            srt_file.write("%s --> %s\n%s" % (
-                time_converter(segment[0].start),
-                time_converter(segment[-1].end),
-                join_text(segment, max_chars_line)
-            ))
-            if i != len(segments):
-                srt_file.write("\n\n")
+        srt_file.write("\n\n".join(entries))
 
 
 # ---------------------------------------------------------------------
-# Main wrapper function
+# Main wrapper functions
 # ---------------------------------------------------------------------
+def transcribe_file(audio_file_path, model_size="large-v3-turbo", device="auto",
+                    compute_type="auto", model=None, batch_size=1,
+                    vad_parameters=None, language=None):
+    """Load and transcribe an audio file and return the list of Whisper segments."""
+    print(f"Extracting subtitles for '{ntpath.basename(audio_file_path)}' ...")
+    audio = load_audio(audio_file_path)
+    segments, info = generate_subtitles(audio, model_size, device, compute_type,
+                                        model=model, batch_size=batch_size,
+                                        vad_parameters=vad_parameters,
+                                        language=language)
+    return collect_segments(segments, info)
+
+
+def write_subtitles_from_segments(segments, srt_file_path,
+                                  max_lines=2,
+                                  max_chars_line=40,
+                                  min_std_time=2,
+                                  max_std_time=5):
+    """Split transcribed Whisper segments into subtitles and write them to a .srt file."""
+    word_list = extract_wordlist(segments)
+    sentences_list = generate_list_of_segments_from_words(word_list)
+    segments_list = generate_subtitle_segments(sentences_list, min_std_time, max_std_time, max_lines, max_chars_line)
+    segments_list = insert_frame(segments_list, frame_time=0.042)
+    write_subtitles(srt_file_path, segments_list, max_chars_line)
+
+
 def generate_subtitles_from_file(audio_file_path, srt_file_path,
-                                 model_size="large", device="cpu",
-                                 compute_type="int8",
+                                 model_size="large-v3-turbo", device="auto",
+                                 compute_type="auto",
                                  max_lines=2,
                                  max_chars_line=40,
                                  min_std_time=2,
-                                 max_std_time=5):
+                                 max_std_time=5,
+                                 model=None,
+                                 batch_size=1,
+                                 vad_parameters=None,
+                                 language=None):
     """
     Transcribe an audio file and generate a subtitle file (.srt).
 
@@ -278,11 +445,15 @@ def generate_subtitles_from_file(audio_file_path, srt_file_path,
     srt_file_path : str or Path
         Path to the output subtitle file (.srt).
     model_size : str, optional
-        Whisper model size (default: 'large').
+        Whisper model size (default: 'large-v3-turbo').
     device : str, optional
-        Hardware used for model execution ("cpu" or "cuda" for GPU)
+        Hardware used for model execution ("cpu", "cuda" for GPU or "auto"
+        to use the GPU if one is available; default: "auto")
     compute_type : str, optional
-        Precision of numerical calculations (e.g. "float32", "float16", "int8")
+        Precision of numerical calculations (e.g. "float32", "float16", "int8",
+        "int8_float16" or "auto" for the fastest precision the device supports,
+        usually "int8_float16" on GPU and "int8" on CPU;
+        default: "auto")
     max_lines : int, optional
         Maximum number of lines per subtitle (default: 2).
     max_chars_line : int, optional
@@ -291,17 +462,27 @@ def generate_subtitles_from_file(audio_file_path, srt_file_path,
         Minimum subtitle duration in seconds (default: 2).
     max_std_time : float, optional
         Maximum subtitle duration in seconds (default: 5).
+    model : WhisperModel, optional
+        Already loaded Whisper model. If None, the model is loaded via
+        get_model() and cached for later calls.
+    batch_size : int, optional
+        Number of audio chunks decoded per batch (default: 1, no batching).
+    vad_parameters : dict, optional
+        Options for the voice activity detection, e.g. "threshold",
+        "min_silence_duration_ms" or "speech_pad_ms" (default: None,
+        faster-whisper's defaults).
+    language : str, optional
+        Language code of the audio (e.g. "de"). If None, the language is
+        detected automatically (default: None).
     """
-    print(f"Extracting subtitles for '{ntpath.basename(audio_file_path)}' ...")
     start_time = datetime.datetime.now()
 
-    segments, _ = generate_subtitles(audio_file_path, model_size, device, compute_type)
-    segments = list(segments)
-    word_list = extract_wordlist(segments)
-    sentences_list = generate_list_of_segments_from_words(word_list)
-    segments_list = generate_subtitle_segments(sentences_list, min_std_time, max_std_time, max_lines, max_chars_line)
-    segments_list = insert_frame(segments_list, frame_time=0.042)
-    write_subtitles(srt_file_path, segments_list, max_chars_line)
+    segments = transcribe_file(audio_file_path, model_size, device, compute_type,
+                               model=model, batch_size=batch_size,
+                               vad_parameters=vad_parameters,
+                               language=language)
+    write_subtitles_from_segments(segments, srt_file_path, max_lines, max_chars_line,
+                                  min_std_time, max_std_time)
 
     end_time = datetime.datetime.now()
     print(f"Finished generating subtitles in {end_time - start_time}.\n")
@@ -18,13 +18,23 @@ Arguments
 ---------
 --audio        Path to a single audio file (.wav) or a folder with multiple audio files.
 --output       Output directory for the generated .srt files. (Default: "subtitles")
---model_size   Whisper model size (tiny, base, small, medium, large). (Default: large)
---device       Device to use ("cpu" or "cuda"). (Default: cpu)
---compute_type Precision for computations ("int8", "float16", "float32"). (Default: int8)
+--model_size   Whisper model size (tiny, base, small, medium, large, large-v2, large-v3,
+               large-v3-turbo, distil-large-v3). (Default: large-v3-turbo)
+--device       Device to use ("auto", "cpu" or "cuda"). (Default: auto, GPU if available)
+--compute_type Precision for computations ("auto", "int8", "int8_float16", "int8_float32",
+               "float16", "bfloat16", "float32"). (Default: auto, int8_float16 on GPU and int8 on CPU
+               if supported by the device)
+--language     Language code of the audio, or "auto" to detect it. (Default: de)
+--cpu_threads  Number of threads used for transcription on CPU (Default: 0, all cores)
 --max_lines    Maximum lines per subtitle (Default: 2)
 --max_chars_line Maximum characters per subtitle line (Default: 40)
 --min_std_time Minimum subtitle duration in seconds (Default: 2)
 --max_std_time Maximum subtitle duration in seconds (Default: 5)
+--batch_size   Number of audio chunks transcribed per batch, >1 mainly helps on GPU (Default: 1)
+--vad_threshold      Speech probability threshold of the voice activity detection
+--vad_min_silence_ms Minimum silence in ms that separates speech chunks
+--vad_speech_pad_ms  Padding in ms added around detected speech
+                     (Defaults: faster-whisper's VAD defaults)
 
 References
 ----------
@@ -47,10 +57,39 @@ License: MIT
 """
 
 import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
-from auto_subtitle_generator.GenerateSubtitles import generate_subtitles_from_file
+try:
+    # Private in faster-whisper; --language is only validated if it is available
+    from faster_whisper.tokenizer import _LANGUAGE_CODES
+except ImportError:
+    _LANGUAGE_CODES = None
+
+from auto_subtitle_generator.GenerateSubtitles import (
+    compute_type_supported, cuda_available, generate_subtitles_from_file,
+    get_model, resolve_compute_type, resolve_device, transcribe_file,
+    write_subtitles_from_segments
+)
+
+
+def write_subtitles_and_time(segments, srt_file_path, **kwargs):
+    """Write the subtitles of one file and return the time they were finished."""
+    write_subtitles_from_segments(segments, srt_file_path, **kwargs)
+    return datetime.now()
+
+
+def report_finished(future, srt_file_path, file_start_time):
+    """Wait for the post-processing of one file and print its summary."""
+    try:
+        end_time = future.result()
+    except Exception as error:
+        print(f"   → Failed to write {srt_file_path}: {error}")
+        raise
+    print(f"Finished generating subtitles in {end_time - file_start_time}.\n")
+    print(f"   → Saved to {srt_file_path}")
 
 
 def main():
@@ -65,15 +104,30 @@ def main():
                         help="Path to an audio file (.wav) or a folder containing multiple audio files.")
     parser.add_argument("--output", type=str, default="subtitles",
                         help="Output folder where subtitles (.srt) will be saved.")
-    parser.add_argument("--model_size", type=str, default="large",
-                        choices=["tiny", "base", "small", "medium", "large"],
-                        help="Whisper model size to use (default: 'large').")
-    parser.add_argument("--device", type=str, default="cpu",
-                        choices=["cpu", "cuda"],
-                        help="Hardware used for model execution (default: 'cpu' or 'cuda' for GPU).")
-    parser.add_argument("--compute_type", type=str, default="int8",
-                        choices=["int8", "float16", "float32"],
-                        help="Precision of numerical calculations (e.g. 'float16', 'float32', 'int8' (default))")
+    parser.add_argument("--model_size", type=str, default="large-v3-turbo",
+                        choices=["tiny", "base", "small", "medium", "large", "large-v2",
+                                 "large-v3", "large-v3-turbo", "distil-large-v3"],
+                        help="Whisper model size to use (default: 'large-v3-turbo'). "
+                             "'large-v3-turbo' is several times faster than 'large-v3' with nearly "
+                             "the same accuracy; use 'large-v3' for the best accuracy. "
+                             "'distil-large-v3' is fastest but supports English only "
+                             "(requires '--language en').")
+    parser.add_argument("--device", type=str, default="auto",
+                        choices=["auto", "cpu", "cuda"],
+                        help="Hardware used for model execution: 'cpu', 'cuda' for GPU or "
+                             "'auto' (default) to use the GPU if one is available.")
+    parser.add_argument("--compute_type", type=str, default="auto",
+                        choices=["auto", "int8", "int8_float16", "int8_float32",
+                                 "float16", "bfloat16", "float32"],
+                        help="Precision of numerical calculations (e.g. 'float16', 'float32', 'int8', "
+                             "'int8_float16' (int8 weights with float16 computation, GPU only) "
+                             "or 'auto' (default) for 'int8_float16' on GPU and 'int8' on CPU, "
+                             "falling back to a precision the device supports)")
+    parser.add_argument("--language", type=str, default="de",
+                        help="Language code of the audio (e.g. 'de', 'en'), or 'auto' to detect "
+                             "the language; a fixed language skips language detection (default: 'de').")
+    parser.add_argument("--cpu_threads", type=int, default=0,
+                        help="Number of threads used for transcription on CPU (default: 0, all cores).")
     parser.add_argument("--max_lines", type=int, default=2,
                         help="Max number of lines per subtitle (default: 2).")
     parser.add_argument("--max_chars_line", type=int, default=40,
@@ -82,8 +136,50 @@ def main():
                         help="Minimum subtitle duration in seconds (default: 2).")
     parser.add_argument("--max_std_time", type=int, default=5,
                         help="Maximum subtitle duration in seconds (default: 5).")
+    parser.add_argument("--batch_size", type=int, default=1,
+                        help="Number of audio chunks transcribed per batch; values like 8-16 "
+                             "speed up transcription on GPU (default: 1, no batching).")
+    parser.add_argument("--vad_threshold", type=float, default=None,
+                        help="Speech probability threshold of the voice activity detection "
+                             "(default: faster-whisper's default).")
+    parser.add_argument("--vad_min_silence_ms", type=int, default=None,
+                        help="Minimum silence in milliseconds that separates speech chunks; "
+                             "smaller values cut more silence (default: faster-whisper's default).")
+    parser.add_argument("--vad_speech_pad_ms", type=int, default=None,
+                        help="Padding in milliseconds added around detected speech "
+                             "(default: faster-whisper's default).")
 
     args = parser.parse_args()
+    if args.cpu_threads < 0:
+        parser.error("--cpu_threads must be 0 (all cores) or a positive number.")
+
+    if args.device == "cpu" and cuda_available():
+        print("Note: a CUDA GPU is available. Use '--device cuda' (or 'auto') "
+              "for much faster transcription.")
+    args.device = resolve_device(args.device)
+    if args.device == "cuda" and not cuda_available():
+        parser.error("--device cuda was requested, but no CUDA device was found.")
+    if args.compute_type != "auto" and not compute_type_supported(args.device, args.compute_type):
+        parser.error(f"--compute_type {args.compute_type} is not supported on device "
+                     f"'{args.device}'; use '--compute_type auto' to pick a supported precision.")
+    args.compute_type = resolve_compute_type(args.device, args.compute_type)
+
+    args.language = args.language.lower()
+    if (args.language != "auto" and _LANGUAGE_CODES is not None
+            and args.language not in _LANGUAGE_CODES):
+        parser.error(f"--language {args.language} is not a Whisper language code "
+                     f"(e.g. 'de', 'en') or 'auto'.")
+    if args.model_size == "distil-large-v3" and args.language != "en":
+        parser.error("--model_size distil-large-v3 supports English only; "
+                     "use it with '--language en'.")
+    language = None if args.language == "auto" else args.language
+
+    vad_options = {
+        "threshold": args.vad_threshold,
+        "min_silence_duration_ms": args.vad_min_silence_ms,
+        "speech_pad_ms": args.vad_speech_pad_ms,
+    }
+    vad_parameters = {key: value for key, value in vad_options.items() if value is not None} or None
 
     # --- Setup ---
     audio_path = Path(args.audio)
@@ -98,6 +194,8 @@ def main():
     print(f" Model:        {args.model_size}")
     print(f"️ Device:     {args.device}")
     print(f"️ Precision:     {args.compute_type}")
+    print(f" Language:     {args.language}")
+    print(f" Batch size:   {args.batch_size}")
     print("-" * 60)
 
     start_time = datetime.now()
@@ -109,6 +207,7 @@ def main():
         srt_name = audio_path.stem + ".srt"
         srt_file_path = output_path / srt_name
 
+        model = get_model(args.model_size, args.device, args.compute_type, args.cpu_threads)
         generate_subtitles_from_file(
             audio_file_path=audio_path,
             srt_file_path=srt_file_path,
@@ -118,7 +217,11 @@ def main():
             max_lines=args.max_lines,
             max_chars_line=args.max_chars_line,
             min_std_time=args.min_std_time,
-            max_std_time=args.max_std_time
+            max_std_time=args.max_std_time,
+            model=model,
+            batch_size=args.batch_size,
+            vad_parameters=vad_parameters,
+            language=language
         )
         print(f"   → Saved to {srt_file_path}")
 
@@ -134,24 +237,59 @@ def main():
         for f in audio_files:
             print(f"   - {f.name}")
 
-        for i, audio_file in enumerate(audio_files, start=1):
-            print(f"\n[{i}/{len(audio_files)}] Processing: {audio_file.name}")
-            # srt_name = audio_file.stem.replace("_audio", "") + ".srt"
-            srt_name = audio_file.stem + ".srt"
-            srt_file_path = output_path / srt_name
-
-            generate_subtitles_from_file(
-                audio_file_path=audio_file,
-                srt_file_path=srt_file_path,
-                model_size=args.model_size,
-                device=args.device,
-                compute_type=args.compute_type,
-                max_lines=args.max_lines,
-                max_chars_line=args.max_chars_line,
-                min_std_time=args.min_std_time,
-                max_std_time=args.max_std_time
-            )
-            print(f"   → Saved to {srt_file_path}")
+        # --- Load the model once and reuse it for all files ---
+        model = get_model(args.model_size, args.device, args.compute_type, args.cpu_threads)
+
+        # Post-processing and writing of file N runs in a background thread
+        # while file N+1 is already being transcribed.
+        pending = deque()
+        completed = False
+        with ThreadPoolExecutor(max_workers=2) as postprocessor:
+            try:
+                for i, audio_file in enumerate(audio_files, start=1):
+                    print(f"\n[{i}/{len(audio_files)}] Processing: {audio_file.name}")
+                    # srt_name = audio_file.stem.replace("_audio", "") + ".srt"
+                    srt_name = audio_file.stem + ".srt"
+                    srt_file_path = output_path / srt_name
+                    file_start_time = datetime.now()
+
+                    segments = transcribe_file(
+                        audio_file_path=audio_file,
+                        model_size=args.model_size,
+                        device=args.device,
+                        compute_type=args.compute_type,
+                        model=model,
+                        batch_size=args.batch_size,
+                        vad_parameters=vad_parameters,
+                        language=language
+                    )
+                    future = postprocessor.submit(
+                        write_subtitles_and_time,
+                        segments,
+                        srt_file_path,
+                        max_lines=args.max_lines,
+                        max_chars_line=args.max_chars_line,
+                        min_std_time=args.min_std_time,
+                        max_std_time=args.max_std_time
+                    )
+                    pending.append((future, srt_file_path, file_start_time))
+
+                    # Limit the queue so that finished subtitles are reported early
+                    while len(pending) > 2 or (pending and pending[0][0].done()):
+                        report_finished(*pending.popleft())
+                completed = True
+            finally:
+                # Report every queued file, even if transcribing a later one failed
+                errors = []
+                while pending:
+                    try:
+                        report_finished(*pending.popleft())
+                    except Exception as error:
+                        errors.append(error)
+                # Post-processing errors were already printed; re-raise them only
+                # if no transcription error (or interrupt) is propagating.
+                if errors and completed:
+                    raise errors[0]
 
     else:
         print("Invalid input path. Please provide a valid file or folder.")
@@ -11,13 +11,18 @@ Run from the command line:
 
     python video_to_audio.py --input /path/to/videos --output /path/to/audios
 
+Use --workers N to limit the number of videos processed in parallel
+(default: number of CPU cores).
+
 Author: Ludmila Himmelspach
 License: MIT
 """
 
 import datetime
+import os
 import subprocess
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from auto_subtitle_generator.FindAllFiles import find_all_files
 
@@ -27,8 +32,8 @@ def extract_audio_from_video(video_file_path, audio_file_path):
     Extract audio from a video file and save it as a WAV file.
 
     This function uses FFmpeg via a subprocess call to extract the audio track
-    from a given video file and store it in WAV format. It supports stereo
-    output with 32-bit PCM encoding.
+    from a given video file and store it in WAV format. The audio is written
+    as 16-bit PCM mono at 16 kHz, the format Whisper works with internally.
 
        Parameters
        ----------
@@ -49,8 +54,10 @@ def extract_audio_from_video(video_file_path, audio_file_path):
     ffmpeg_command = [
         "ffmpeg",
         "-i", str(video_file_path),
-        "-acodec", "pcm_s32le",
-        "-ac", "2",
+        "-acodec", "pcm_s16le",
+        "-ac", "1",
+        "-ar", "16000",
+        "-vn",
         "-y",
         str(audio_file_path)
     ]
@@ -78,8 +85,16 @@ def main():
         required=True,
         help="Path to the output folder where audio files will be saved."
     )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=None,
+        help="Number of videos processed in parallel (default: number of CPU cores)."
+    )
 
     args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1.")
     video_path = args.input
     audio_path = args.output
 
@@ -95,12 +110,18 @@ def main():
     print("Extracting audio files ...")
     start_time = datetime.datetime.now()
 
-    for video_file in video_file_list:
+    def extract(video_file):
         video_file_path = video_path / video_file
         audio_file_name = video_file_path.stem + "_audio.wav"
         audio_file_path = audio_path / audio_file_name
         extract_audio_from_video(video_file_path, audio_file_path)
 
+    # Each extraction runs in its own FFmpeg process, so threads are enough
+    # to keep several of them busy at the same time.
+    max_workers = min(len(video_file_list), args.workers or os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(extract, video_file_list))
+
     end_time = datetime.datetime.now()
     print("Audio extraction finished.")
     print("Total extraction time:", end_time - start_time)